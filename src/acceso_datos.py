@@ -0,0 +1,67 @@
+import random
+from almacen_textos import resolver_documento
+
+# --- CONFIGURACIÓN ---
+TAM_PAGINA = 500   # Registros por llamada a collection.get()
+
+
+def iterar_coleccion(collection, include=("metadatas",), tam_pagina=TAM_PAGINA):
+    """
+    Recorre la colección en páginas de tam_pagina registros pidiendo solo los
+    campos de `include` (nunca los documentos si no se piden). Cada página es
+    el dict que devuelve Chroma: {'ids': [...], 'metadatas': [...], ...}.
+    """
+    offset = 0
+    while True:
+        pagina = collection.get(include=list(include), limit=tam_pagina, offset=offset)
+        if not pagina['ids']:
+            return
+        yield pagina
+        offset += len(pagina['ids'])
+        if len(pagina['ids']) < tam_pagina:
+            return
+
+
+def iterar_metadatos(collection, tam_pagina=TAM_PAGINA):
+    """Generador de (id, metadatos) paginado, sin traer el texto de los CVs."""
+    for pagina in iterar_coleccion(collection, ("metadatas",), tam_pagina):
+        yield from zip(pagina['ids'], pagina['metadatas'])
+
+
+def listar_ids(collection, tam_pagina=TAM_PAGINA):
+    ids = []
+    for pagina in iterar_coleccion(collection, (), tam_pagina):
+        ids.extend(pagina['ids'])
+    return ids
+
+
+def muestrear_ids(collection, n, semilla=None):
+    """
+    Muestra aleatoria de n ids sin listar toda la colección: se sortean
+    posiciones en [0, count) y se lee cada una con limit=1/offset.
+    Con la misma semilla NO sale la misma muestra que random.sample sobre
+    todos los ids: las auditorías con etiquetas guardadas no deben usarla.
+    """
+    total = collection.count()
+    if total <= n:
+        return listar_ids(collection)
+    rng = random.Random(semilla)
+    posiciones = rng.sample(range(total), n)
+    return [collection.get(include=[], limit=1, offset=pos)['ids'][0] for pos in posiciones]
+
+
+def obtener_texto(collection, doc_id):
+    """Texto completo de un CV, cargado bajo demanda (inline o desde el almacén externo)."""
+    datos = collection.get(ids=[doc_id], include=['documents'])
+    if not datos['ids']:
+        return ""
+    return resolver_documento(datos['documents'][0])
+
+
+def obtener_metadatos(collection, ids, tam_pagina=TAM_PAGINA):
+    """Metadatos de una lista de ids, como dict id -> metadatos."""
+    metas = {}
+    for i in range(0, len(ids), tam_pagina):
+        datos = collection.get(ids=ids[i:i + tam_pagina], include=['metadatas'])
+        metas.update(zip(datos['ids'], datos['metadatas']))
+    return metas
@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+import random
+import hashlib
+from functools import lru_cache
+
+# zstandard es opcional: sin él los textos se siguen guardando dentro de Chroma
+try:
+    import zstandard as zstd
+    ZSTD_DISPONIBLE = True
+except ImportError:
+    ZSTD_DISPONIBLE = False
+
+# --- CONFIGURACIÓN ---
+CHROMA_DB_PATH = "./candidates_db"
+COLLECTION_NAME = "cvu_candidatos"
+DIRECTORIO_TEXTOS = "./candidates_db/textos"
+DIRECTORIO_DICCIONARIOS = "./candidates_db/textos/diccionarios"
+PREFIJO_REFERENCIA = "ref:"   # Documento en Chroma = "ref:<sha256>"
+NIVEL_ZSTD = 9
+TAM_DICCIONARIO = 112 * 1024
+MUESTRA_ENTRENAMIENTO = 2000  # Textos usados para entrenar el diccionario
+MUESTRA_LATENCIA = 200        # Lecturas usadas para medir la latencia
+
+_compresor = None
+
+
+def _ruta_blob(clave):
+    return os.path.join(DIRECTORIO_TEXTOS, clave[:2], f"{clave}.zst")
+
+
+def _diccionario_actual():
+    """El diccionario entrenado más reciente, o None si no hay ninguno."""
+    if not os.path.isdir(DIRECTORIO_DICCIONARIOS):
+        return None
+    archivos = [os.path.join(DIRECTORIO_DICCIONARIOS, f) for f in os.listdir(DIRECTORIO_DICCIONARIOS)
+                if f.endswith(".zdict")]
+    if not archivos:
+        return None
+    with open(max(archivos, key=os.path.getmtime), 'rb') as f:
+        return zstd.ZstdCompressionDict(f.read())
+
+
+@lru_cache(maxsize=None)
+def _diccionario_por_id(dict_id):
+    with open(os.path.join(DIRECTORIO_DICCIONARIOS, f"{dict_id}.zdict"), 'rb') as f:
+        return zstd.ZstdCompressionDict(f.read())
+
+
+def _obtener_compresor():
+    global _compresor
+    if _compresor is None:
+        dic = _diccionario_actual()
+        _compresor = zstd.ZstdCompressor(level=NIVEL_ZSTD, dict_data=dic) if dic else zstd.ZstdCompressor(level=NIVEL_ZSTD)
+    return _compresor
+
+
+def _exigir_zstd():
+    if not ZSTD_DISPONIBLE:
+        raise RuntimeError("El almacén externo de textos usa zstd: instala 'zstandard' (pip install zstandard).")
+
+
+def es_referencia(documento):
+    return bool(documento) and documento.startswith(PREFIJO_REFERENCIA)
+
+
+def guardar_texto(texto):
+    """
+    Guarda el texto comprimido con zstd bajo su hash SHA-256 y devuelve la
+    referencia para Chroma. Textos idénticos se guardan una sola vez.
+    """
+    _exigir_zstd()
+    datos = texto.encode('utf-8')
+    clave = hashlib.sha256(datos).hexdigest()
+    ruta = _ruta_blob(clave)
+    if not os.path.exists(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(_obtener_compresor().compress(datos))
+        os.replace(tmp, ruta)
+    return PREFIJO_REFERENCIA + clave
+
+
+def cargar_texto(referencia):
+    """Descomprime el texto de una referencia 'ref:<sha256>'."""
+    _exigir_zstd()
+    clave = referencia[len(PREFIJO_REFERENCIA):]
+    with open(_ruta_blob(clave), 'rb') as f:
+        comprimido = f.read()
+    dict_id = zstd.get_frame_parameters(comprimido).dict_id
+    if dict_id:
+        descompresor = zstd.ZstdDecompressor(dict_data=_diccionario_por_id(dict_id))
+    else:
+        descompresor = zstd.ZstdDecompressor()
+    return descompresor.decompress(comprimido).decode('utf-8')
+
+
+def resolver_documento(documento):
+    """Devuelve el texto completo tanto si el documento es inline como si es una referencia."""
+    if es_referencia(documento):
+        return cargar_texto(documento)
+    return documento or ""
+
+
+def _listar_blobs():
+    for raiz, _, archivos in os.walk(DIRECTORIO_TEXTOS):
+        if raiz.startswith(DIRECTORIO_DICCIONARIOS):
+            continue
+        for archivo in archivos:
+            if archivo.endswith(".zst"):
+                yield os.path.join(raiz, archivo)
+
+
+def vaciar_almacen():
+    """Borra todos los textos (los diccionarios se conservan). Para reconstrucciones completas."""
+    borrados = 0
+    for ruta in list(_listar_blobs()):
+        os.remove(ruta)
+        borrados += 1
+    return borrados
+
+
+def recolectar_huerfanos(collection):
+    """
+    Borra los textos que ya no referencia ningún documento de la colección
+    (CVs reindexados con otro texto, imports con --forzar...). Los blobs
+    escritos durante el recorrido se respetan, pero conviene no ingestar a la vez.
+    """
+    from acceso_datos import iterar_coleccion
+    inicio = time.time()
+    vivas = set()
+    for pagina in iterar_coleccion(collection, ("documents",)):
+        vivas.update(d[len(PREFIJO_REFERENCIA):] for d in pagina['documents'] if es_referencia(d))
+
+    borrados = liberados = 0
+    for ruta in list(_listar_blobs()):
+        if os.path.basename(ruta)[:-4] in vivas or os.path.getmtime(ruta) >= inicio:
+            continue
+        liberados += os.path.getsize(ruta)
+        os.remove(ruta)
+        borrados += 1
+    print(f"🧹 {borrados} textos huérfanos borrados ({liberados / 1e6:.2f} MB liberados).")
+
+
+def entrenar_diccionario():
+    """Entrena un diccionario zstd con una muestra de los textos ya almacenados."""
+    global _compresor
+    rutas = list(_listar_blobs())
+    if not rutas:
+        print("📭 No hay textos almacenados para entrenar.")
+        return
+    muestra = random.sample(rutas, min(MUESTRA_ENTRENAMIENTO, len(rutas)))
+    textos = [cargar_texto(PREFIJO_REFERENCIA + os.path.basename(r)[:-4]).encode('utf-8') for r in muestra]
+
+    try:
+        dic = zstd.train_dictionary(TAM_DICCIONARIO, textos)
+    except zstd.ZstdError as e:
+        # zstd necesita bastantes muestras (y de tamaño suficiente) para entrenar
+        print(f"❌ No se pudo entrenar el diccionario con {len(textos)} CVs: {e}. Ingesta más CVs y reintenta.")
+        return
+    os.makedirs(DIRECTORIO_DICCIONARIOS, exist_ok=True)
+    with open(os.path.join(DIRECTORIO_DICCIONARIOS, f"{dic.dict_id()}.zdict"), 'wb') as f:
+        f.write(dic.as_bytes())
+    _compresor = None
+    print(f"📚 Diccionario {dic.dict_id()} entrenado con {len(textos)} CVs. Se usará en los textos nuevos.")
+
+
+def reportar_almacen():
+    """Ratio de compresión y latencia de lectura del almacén externo."""
+    rutas = list(_listar_blobs())
+    if not rutas:
+        print("📭 El almacén de textos está vacío.")
+        return
+
+    bytes_originales = bytes_comprimidos = 0
+    for ruta in rutas:
+        with open(ruta, 'rb') as f:
+            comprimido = f.read()
+        bytes_comprimidos += len(comprimido)
+        bytes_originales += zstd.get_frame_parameters(comprimido).content_size
+
+    latencias = []
+    for ruta in random.sample(rutas, min(MUESTRA_LATENCIA, len(rutas))):
+        t0 = time.perf_counter()
+        cargar_texto(PREFIJO_REFERENCIA + os.path.basename(ruta)[:-4])
+        latencias.append((time.perf_counter() - t0) * 1000)
+    latencias.sort()
+    ruta_sqlite = os.path.join(CHROMA_DB_PATH, "chroma.sqlite3")
+
+    print(f"📦 Textos: {len(rutas)} | Original: {bytes_originales / 1e6:.2f} MB | "
+          f"Comprimido: {bytes_comprimidos / 1e6:.2f} MB | Ratio: {bytes_originales / max(1, bytes_comprimidos):.2f}x")
+    print(f"⏱️  Lectura: media {sum(latencias) / len(latencias):.2f} ms | "
+          f"p95 {latencias[int(0.95 * (len(latencias) - 1))]:.2f} ms ({len(latencias)} lecturas)")
+    if os.path.exists(ruta_sqlite):
+        print(f"🗄️  Store de Chroma (SQLite): {os.path.getsize(ruta_sqlite) / 1e6:.2f} MB")
+
+
+def migrar_coleccion(collection):
+    """Mueve a este almacén los textos que aún están inline en Chroma."""
+    from acceso_datos import iterar_coleccion
+    movidos = 0
+    for pagina in iterar_coleccion(collection, ("documents",)):
+        ids, refs = [], []
+        for doc_id, documento in zip(pagina['ids'], pagina['documents']):
+            if documento and not es_referencia(documento):
+                ids.append(doc_id)
+                refs.append(guardar_texto(documento))
+        if ids:
+            collection.update(ids=ids, documents=refs)
+            movidos += len(ids)
+    print(f"🚚 {movidos} textos movidos al almacén externo.")
+
+
+if __name__ == "__main__":
+    if not ZSTD_DISPONIBLE:
+        print("❌ Error: instala 'zstandard' para usar el almacén de textos.")
+        exit()
+    comando = sys.argv[1] if len(sys.argv) > 1 else "reporte"
+    if comando == "entrenar":
+        entrenar_diccionario()
+    elif comando in ("migrar", "limpiar"):
+        import chromadb
+        collection = chromadb.PersistentClient(path=CHROMA_DB_PATH).get_collection(COLLECTION_NAME)
+        if comando == "migrar":
+            migrar_coleccion(collection)
+        else:
+            recolectar_huerfanos(collection)
+    else:
+        reportar_almacen()
@@ -4,6 +4,7 @@ import pandas as pd
 from tabulate import tabulate
 import random
 import time
+from acceso_datos import listar_ids, obtener_metadatos
 
 # --- CONFIGURACIÓN ---
 CHROMA_DB_PATH = "./candidates_db"
@@ -87,7 +88,7 @@ def ejecutar_auditoria():
     col, model = conectar_db()
     
     # 1. OBTENER MUESTRA
-    todos_ids = col.get(include=[])['ids']
+    todos_ids = listar_ids(col)
     
     if len(todos_ids) < TAMAÑO_MUESTRA:
         ids_muestra = todos_ids
@@ -96,8 +97,7 @@ def ejecutar_auditoria():
         ids_muestra = random.sample(todos_ids, TAMAÑO_MUESTRA)
 
     # Recuperamos metadatos
-    datos = col.get(ids=ids_muestra, include=['metadatas'])
-    metas = {id_: meta for id_, meta in zip(datos['ids'], datos['metadatas'])}
+    metas = obtener_metadatos(col, ids_muestra)
 
     # --- NUEVA FUNCIÓN: MOSTRAR QUIÉNES SON ---
     ver_muestra_seleccionada(ids_muestra, metas)
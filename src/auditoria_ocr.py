@@ -0,0 +1,135 @@
+import os
+import csv
+import random
+import fitz  # PyMuPDF
+from tabulate import tabulate
+from clasificador_paginas import clasificar_pagina, ESCALA_OCR_BASE
+from motor_ocr import crear_motor_ocr
+
+# --- 1. CONFIGURACIÓN GENERAL ---
+DIRECTORIO_PDFS = "./carpeta_cvus_test"
+ARCHIVO_VERDAD = "paginas_etiquetadas.csv"   # Etiquetas manuales por página
+
+# --- 2. PARÁMETROS DE EXPERIMENTACIÓN ---
+SEMILLA = 42
+TAMAÑO_MUESTRA = 50   # Páginas escaneadas (sin texto digital) a auditar
+
+
+def listar_paginas_escaneadas():
+    """IDs 'archivo#página' de todas las páginas que irían a OCR."""
+    paginas = []
+    for archivo in sorted(os.listdir(DIRECTORIO_PDFS)):
+        if not archivo.lower().endswith(".pdf"):
+            continue
+        with fitz.open(os.path.join(DIRECTORIO_PDFS, archivo)) as doc:
+            for n, pagina in enumerate(doc):
+                if len(pagina.get_text().strip()) <= 50:
+                    paginas.append(f"{archivo}#{n}")
+    return paginas
+
+
+def obtener_muestra_controlada():
+    todas = listar_paginas_escaneadas()
+    if len(todas) <= TAMAÑO_MUESTRA:
+        return todas
+    random.seed(SEMILLA)
+    return random.sample(todas, TAMAÑO_MUESTRA)
+
+
+def abrir_pagina(id_pagina):
+    archivo, n = id_pagina.rsplit("#", 1)
+    doc = fitz.open(os.path.join(DIRECTORIO_PDFS, archivo))
+    return doc, doc[int(n)]
+
+
+def generar_reporte_muestra(ids_muestra):
+    """Genera el CSV para que el humano marque qué páginas tienen texto útil."""
+    filas = []
+    for id_pagina in ids_muestra:
+        doc, pagina = abrir_pagina(id_pagina)
+        with doc:
+            d = clasificar_pagina(pagina)
+        filas.append([id_pagina, 0, d["motivo"], f"{d['densidad']:.4f}", d["lineas_texto"]])
+
+    with open(ARCHIVO_VERDAD, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID_Pagina", "Etiqueta_Humana", "Motivo_Clasificador", "Densidad", "Lineas_Texto"])
+        writer.writerows(filas)
+    print(f"💾 Archivo '{ARCHIVO_VERDAD}' creado con {len(filas)} páginas.")
+    print("👀 TAREA: marca 'Etiqueta_Humana' con 1 si la página tiene texto útil del CV y vuelve a ejecutar.")
+
+
+def cargar_verdad_terreno():
+    if not os.path.exists(ARCHIVO_VERDAD):
+        return None
+    verdad = {}
+    with open(ARCHIVO_VERDAD, mode='r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            try:
+                verdad[row["ID_Pagina"]] = int(row["Etiqueta_Humana"])
+            except (KeyError, ValueError):
+                print(f"⚠️ Ignorando fila inválida: {row}")
+    return verdad
+
+
+def ejecutar_auditoria_ocr():
+    verdad = cargar_verdad_terreno()
+    if not verdad:
+        generar_reporte_muestra(obtener_muestra_controlada())
+        return
+
+    motor = crear_motor_ocr()
+    tp = tn = fp = fn = 0
+    palabras_base = palabras_adaptativo = 0
+    omitidas = reducidas = 0
+    detalles_error = []
+
+    for id_pagina, etiqueta in verdad.items():
+        doc, pagina = abrir_pagina(id_pagina)
+        with doc:
+            d = clasificar_pagina(pagina)
+            decision = 1 if d["ocr"] else 0
+            omitidas += 1 - decision
+            reducidas += 1 if d["ocr"] and d["escala"] < ESCALA_OCR_BASE else 0
+
+            # En las páginas con texto comparamos lo que se lee a 2x contra la escala elegida
+            if etiqueta == 1:
+                base = motor.reconocer(pagina.get_pixmap(matrix=fitz.Matrix(ESCALA_OCR_BASE, ESCALA_OCR_BASE)))
+                palabras_base += len(base.split())
+                if d["ocr"]:
+                    adaptativo = motor.reconocer(pagina.get_pixmap(matrix=fitz.Matrix(d["escala"], d["escala"])))
+                    palabras_adaptativo += len(adaptativo.split())
+
+        if etiqueta == 1 and decision == 1: tp += 1
+        elif etiqueta == 0 and decision == 0: tn += 1
+        elif etiqueta == 0 and decision == 1:
+            fp += 1   # OCR inútil, pero sin pérdida de información
+        elif etiqueta == 1 and decision == 0:
+            fn += 1
+            detalles_error.append([id_pagina, d["motivo"], f"{d['densidad']:.4f}", d["lineas_texto"]])
+    motor.cerrar()
+
+    print("\n" + "="*60)
+    print("📊 PRE-CLASIFICADOR vs. Criterio Humano")
+    print("="*60)
+    matriz = [
+        ["", "Clasif: OCR", "Clasif: OMITIR"],
+        ["Humano: TEXTO", f"✅ {tp}", f"❌ {fn} (pérdida)"],
+        ["Humano: VACÍA", f"⚠️ {fp}", f"✅ {tn}"]
+    ]
+    print(tabulate(matriz, tablefmt="grid"))
+
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 1.0
+    print(f"\n🎯 RECALL (páginas con texto que sí pasan a OCR): {recall * 100:.2f}%")
+    print(f"   - Páginas omitidas: {omitidas}/{len(verdad)} | OCR a menor resolución: {reducidas}")
+    if palabras_base:
+        print(f"   - Palabras leídas a escala adaptativa vs {ESCALA_OCR_BASE}x: "
+              f"{palabras_adaptativo}/{palabras_base} ({palabras_adaptativo / palabras_base * 100:.1f}%)")
+
+    if detalles_error:
+        print("\n🔍 PÁGINAS CON TEXTO OMITIDAS:")
+        print(tabulate(detalles_error, headers=["Página", "Motivo", "Densidad", "Líneas"], tablefmt="simple"))
+
+
+if __name__ == "__main__":
+    ejecutar_auditoria_ocr()
@@ -5,6 +5,7 @@ from tabulate import tabulate
 import random
 import csv
 import os
+from acceso_datos import listar_ids, obtener_metadatos
 
 # --- 1. CONFIGURACIÓN GENERAL ---
 CHROMA_DB_PATH = "./candidates_db"
@@ -40,7 +41,9 @@ def conectar_db():
 
 def obtener_muestra_controlada(col):
     """Obtiene un conjunto fijo de IDs usando la semilla."""
-    todos_ids = col.get(include=[])['ids']
+    # Mismo sorteo que siempre (random.sample sobre todos los IDs): cambiarlo
+    # desalinearía las etiquetas ya guardadas en ARCHIVO_VERDAD
+    todos_ids = listar_ids(col)
     total = len(todos_ids)
     
     if total < TAMAÑO_MUESTRA:
@@ -51,8 +54,7 @@ def obtener_muestra_controlada(col):
         ids_muestra = random.sample(todos_ids, TAMAÑO_MUESTRA)
         print(f"✅ Muestra de {len(ids_muestra)} CVs seleccionada (Semilla {SEMILLA}).")
 
-    datos = col.get(ids=ids_muestra, include=['metadatas'])
-    metadatas = {id_: meta for id_, meta in zip(datos['ids'], datos['metadatas'])}
+    metadatas = obtener_metadatos(col, ids_muestra)
     return ids_muestra, metadatas
 
 def evaluar_candidato(meta, model):
@@ -0,0 +1,94 @@
+import os
+import io
+import time
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+from tabulate import tabulate
+from motor_ocr import MotorOCRSubproceso, MotorOCRPersistente, TESSEROCR_DISPONIBLE, IDIOMAS_OCR
+
+# --- CONFIGURACIÓN ---
+DIRECTORIO_PDFS = "./carpeta_cvus_test"
+
+# --- PARÁMETROS DEL BENCHMARK ---
+MAX_PAGINAS = 40      # Páginas escaneadas a usar como muestra
+NUM_WORKERS = 4
+
+
+def recolectar_paginas_escaneadas():
+    """Renderiza a 2x las páginas que la ingesta mandaría a OCR (< 50 caracteres digitales)."""
+    pixmaps = []
+    for archivo in sorted(os.listdir(DIRECTORIO_PDFS)):
+        if not archivo.lower().endswith(".pdf"):
+            continue
+        with fitz.open(os.path.join(DIRECTORIO_PDFS, archivo)) as doc:
+            for pagina in doc:
+                if len(pagina.get_text().strip()) > 50:
+                    continue
+                pixmaps.append(pagina.get_pixmap(matrix=fitz.Matrix(2, 2)))
+                if len(pixmaps) >= MAX_PAGINAS:
+                    return pixmaps
+    return pixmaps
+
+
+def ocr_ruta_actual(pix):
+    """Réplica de la ruta anterior: PNG en memoria -> PIL -> pytesseract (proceso nuevo)."""
+    img = Image.open(io.BytesIO(pix.tobytes("png")))
+    try:
+        return pytesseract.image_to_string(img, lang=IDIOMAS_OCR)
+    except:
+        return ""
+
+
+def medir(nombre, funcion, pixmaps):
+    t0 = time.perf_counter()
+    textos = funcion(pixmaps)
+    segundos = time.perf_counter() - t0
+    caracteres = sum(len(t.strip()) for t in textos)
+    return [nombre, len(pixmaps), f"{segundos:.2f}", f"{len(pixmaps) / segundos:.2f}", caracteres], segundos
+
+
+def ejecutar_benchmark():
+    print(f"🔬 BENCHMARK OCR ({IDIOMAS_OCR})")
+    pixmaps = recolectar_paginas_escaneadas()
+    if not pixmaps:
+        print(f"📭 No hay páginas escaneadas en '{DIRECTORIO_PDFS}'.")
+        return
+    print(f"📄 {len(pixmaps)} páginas escaneadas en la muestra.")
+
+    filas = []
+    fila, base = medir("Actual (PNG + subproceso, secuencial)", lambda p: [ocr_ruta_actual(x) for x in p], pixmaps)
+    if fila[4] == 0:
+        # Los errores de Tesseract se convierten en "": sin texto, los tiempos no significan nada
+        print("❌ Error: Tesseract no reconoció ningún carácter. Revisa la instalación y los idiomas "
+              f"'{IDIOMAS_OCR}' (tesseract --list-langs).")
+        return
+    filas.append(fila + ["1.00x"])
+
+    motor = MotorOCRSubproceso(NUM_WORKERS)
+    fila, seg = medir(f"Subproceso, buffer crudo, {NUM_WORKERS} hilos", motor.reconocer_lote, pixmaps)
+    filas.append(fila + [f"{base / seg:.2f}x"])
+    motor.cerrar()
+
+    if TESSEROCR_DISPONIBLE:
+        for n in (1, NUM_WORKERS):
+            t0 = time.perf_counter()
+            try:
+                motor = MotorOCRPersistente(n)
+            except RuntimeError as e:
+                print(f"⚠️ tesserocr no pudo cargar '{IDIOMAS_OCR}' ({e}): se omite el motor persistente.")
+                break
+            arranque = time.perf_counter() - t0
+            fila, seg = medir(f"Persistente (tesserocr), {n} worker(s)", motor.reconocer_lote, pixmaps)
+            filas.append(fila + [f"{base / seg:.2f}x"])
+            print(f"   ⏱️  Carga de idiomas del pool de {n}: {arranque:.2f}s (una sola vez)")
+            motor.cerrar()
+    else:
+        print("⚠️ tesserocr no está instalado: se omite el motor persistente.")
+
+    print(tabulate(filas, headers=["Motor", "Páginas", "Segundos", "Pág/s", "Caracteres", "Speedup"],
+                   tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    ejecutar_benchmark()
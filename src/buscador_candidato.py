@@ -1,10 +1,13 @@
 import chromadb
 from sentence_transformers import SentenceTransformer, util
+from acceso_datos import iterar_metadatos, obtener_texto
 
 # --- CONFIGURACIÓN ---
 CHROMA_DB_PATH = "./candidates_db"
 COLLECTION_NAME = "cvu_candidatos"
 UMBRAL_SEMANTICO = 0.4
+CARACTERES_DETALLE = 1500   # Cuánto texto del CV mostrar en la vista de detalle
+COLAPSAR_DUPLICADOS = True  # Un solo resultado por grupo de CVs casi idénticos
 
 def conectar_db():
     client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
@@ -25,11 +28,8 @@ def calcular_similitud(texto_base, texto_objetivo, model):
 
 def buscar_candidatos():
     collection, model = conectar_db()
-    datos = collection.get()
-    ids = datos['ids']
-    metas = datos['metadatas']
 
-    if not ids:
+    if collection.count() == 0:
         print("📭 Base de datos vacía.")
         return
 
@@ -63,8 +63,10 @@ def buscar_candidatos():
         resultados = []
         print("\n🔄 Analizando y Rankeando candidatos...")
 
-        for i, doc_id in enumerate(ids):
-            m = metas[i]
+        # Solo metadatos y por páginas: el texto completo de los CVs nunca se carga
+        total_evaluados = 0
+        for doc_id, m in iterar_metadatos(collection):
+            total_evaluados += 1
             nombre = m.get('candidate_name', 'Unknown')[:25]
             cv_titulo = m.get('titles', '')
             cv_skills = m.get('skills', '')
@@ -101,6 +103,8 @@ def buscar_candidatos():
 
             resultados.append({
                 "Ranking": 0,
+                "ID": doc_id,
+                "Grupo": m.get('canonical_id', doc_id),
                 "Candidato": nombre,
                 "Match %": final_score * 100,
                 "Detalle Score": detalles_calculo,
@@ -108,6 +112,18 @@ def buscar_candidatos():
             })
 
         resultados.sort(key=lambda x: x["Match %"], reverse=True)
+        colapsados = 0
+        if COLAPSAR_DUPLICADOS:
+            # Nos quedamos con la copia mejor puntuada de cada grupo
+            vistos = set()
+            unicos = []
+            for r in resultados:
+                if r["Grupo"] in vistos:
+                    colapsados += 1
+                    continue
+                vistos.add(r["Grupo"])
+                unicos.append(r)
+            resultados = unicos
         top_candidatos = resultados[:10]
 
         print(f"\n🏆 TOP {len(top_candidatos)} CANDIDATOS - CASO {opcion}:")
@@ -117,8 +133,25 @@ def buscar_candidatos():
             print(f"Match: {candidato['Match %']:.1f}% ({candidato['Detalle Score']})")
             print(f"Info: {candidato['Info']}")
 
-        print(f"\n💡 Nota: Se evaluaron {len(ids)} documentos en total.")
-        input("\nPresiona Enter para continuar...")
+        print(f"\n💡 Nota: Se evaluaron {total_evaluados} documentos en total.")
+        if colapsados:
+            print(f"♻️  Se ocultaron {colapsados} CVs duplicados.")
+        # Vista de detalle: el texto completo solo se carga si se pide
+        while True:
+            eleccion = input("\n📄 Nº de candidato para ver su CV (Enter para continuar): ").strip()
+            if not eleccion:
+                break
+            if not eleccion.isdigit() or not 1 <= int(eleccion) <= len(top_candidatos):
+                print(f"❌ Número inválido (1-{len(top_candidatos)}).")
+                continue
+            elegido = top_candidatos[int(eleccion) - 1]
+            try:
+                texto = obtener_texto(collection, elegido["ID"])
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                continue
+            print(f"\n--- {elegido['Candidato']} ({elegido['ID']}) ---")
+            print(texto[:CARACTERES_DETALLE] + ("..." if len(texto) > CARACTERES_DETALLE else ""))
 
 if __name__ == "__main__":
     buscar_candidatos()
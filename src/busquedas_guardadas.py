@@ -0,0 +1,210 @@
+import os
+import json
+import numpy as np
+from buscador_candidato import conectar_db, COLAPSAR_DUPLICADOS
+from matching_lote import (PESOS_ESTRATEGIA, codificar_textos, cargar_candidatos,
+                           puntuar_bloque, detalle_score)
+
+# --- CONFIGURACIÓN ---
+ARCHIVO_BUSQUEDAS = "./candidates_db/busquedas_guardadas.json"
+TOP_K = 10
+RESERVA = 10   # Entradas extra materializadas por debajo del top-k (cambios y duplicados)
+
+# Invariante de cada shortlist: si "corte" es None contiene a todos los candidatos;
+# si no, contiene exactamente a los candidatos con score >= corte y ningún
+# candidato sin materializar puede superar ese corte.
+
+
+def cargar_busquedas():
+    if not os.path.exists(ARCHIVO_BUSQUEDAS):
+        return {}
+    with open(ARCHIVO_BUSQUEDAS, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_busquedas(busquedas):
+    os.makedirs(os.path.dirname(ARCHIVO_BUSQUEDAS) or ".", exist_ok=True)
+    tmp = ARCHIVO_BUSQUEDAS + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(busquedas, f, ensure_ascii=False)
+    os.replace(tmp, ARCHIVO_BUSQUEDAS)
+
+
+def _puntuar(busqueda, ids, metas, emb_t, emb_s, exp):
+    """Puntúa un conjunto de candidatos contra una búsqueda y devuelve sus mejores entradas."""
+    if not ids:
+        return []
+    q_t = np.array([busqueda["emb_titulo"]], dtype=np.float32)
+    q_s = np.array([busqueda["emb_skills"]], dtype=np.float32)
+    q_exp = np.array([busqueda["experiencia"]], dtype=np.float32)
+    pesos = np.array([PESOS_ESTRATEGIA[busqueda["estrategia"]]], dtype=np.float32)
+    capacidad = min(len(ids), busqueda["k"] + RESERVA)
+
+    idx, scores = puntuar_bloque(q_t, q_s, q_exp, pesos, emb_t, emb_s, exp, capacidad, max(capacidad, 4096))
+
+    entradas = []
+    for c, score in zip(idx[0], scores[0]):
+        c = int(c)
+        score_e = 1.0 if exp[c] >= busqueda["experiencia"] else 0.0
+        entradas.append({
+            "id": ids[c],
+            "canonical_id": metas[c].get('canonical_id', ids[c]),
+            "candidato": metas[c].get('candidate_name', 'Unknown')[:25],
+            "score": float(score),
+            "detalle": detalle_score(busqueda["estrategia"], float(q_t[0] @ emb_t[c]),
+                                     float(q_s[0] @ emb_s[c]), score_e),
+        })
+    return entradas
+
+
+def _recalcular(busqueda, collection, model):
+    """Re-puntúa la búsqueda contra toda la colección (solo al crearla o si la reserva se agota)."""
+    ids, metas, emb_t, emb_s, exp = cargar_candidatos(collection, model)
+    entradas = _puntuar(busqueda, ids, metas, emb_t, emb_s, exp)
+    entradas.sort(key=lambda e: e["score"], reverse=True)
+    busqueda["shortlist"] = entradas
+    busqueda["corte"] = entradas[-1]["score"] if len(ids) > len(entradas) else None
+
+
+def crear_busqueda(id_busqueda, titulo, skills, experiencia, estrategia, collection, model, k=TOP_K):
+    busqueda = {
+        "id": id_busqueda,
+        "titulo": titulo,
+        "skills": skills,
+        "experiencia": experiencia,
+        "estrategia": estrategia,
+        "k": k,
+        "emb_titulo": codificar_textos([titulo], model)[0].tolist(),
+        "emb_skills": codificar_textos([skills], model)[0].tolist(),
+    }
+    _recalcular(busqueda, collection, model)
+
+    busquedas = cargar_busquedas()
+    busquedas[id_busqueda] = busqueda
+    guardar_busquedas(busquedas)
+    return busqueda
+
+
+def reiniciar_shortlists():
+    """Vacía las shortlists (la colección se va a reconstruir desde cero)."""
+    busquedas = cargar_busquedas()
+    if not busquedas:
+        return
+    for busqueda in busquedas.values():
+        busqueda["shortlist"] = []
+        busqueda["corte"] = None
+    guardar_busquedas(busquedas)
+
+
+def actualizar_busquedas(ids, metas, model, collection=None):
+    """
+    Llamado por la ingesta tras hacer upsert de candidatos nuevos o modificados.
+    Solo se puntúa el delta y se fusiona con cada shortlist materializada.
+    """
+    busquedas = cargar_busquedas()
+    if not busquedas or not ids:
+        return
+    # Un id repetido en el delta: vale su última versión (la anterior ya no está en Chroma)
+    ultima = dict(zip(ids, metas))
+    ids, metas = list(ultima), list(ultima.values())
+
+    emb_t = codificar_textos([m.get('titles', '') for m in metas], model)
+    emb_s = codificar_textos([m.get('skills', '') for m in metas], model)
+    exp = np.array([m.get('years_experience', 0) or 0 for m in metas], dtype=np.float32)
+    delta = set(ids)
+
+    for busqueda in busquedas.values():
+        corte = busqueda.get("corte")
+        # Las versiones anteriores de los candidatos modificados dejan de valer
+        shortlist = [e for e in busqueda["shortlist"] if e["id"] not in delta]
+        for e in _puntuar(busqueda, ids, metas, emb_t, emb_s, exp):
+            # Por debajo del corte puede haber candidatos sin materializar con más score
+            if corte is None or e["score"] >= corte:
+                shortlist.append(e)
+        shortlist.sort(key=lambda e: e["score"], reverse=True)
+
+        capacidad = busqueda["k"] + RESERVA
+        if len(shortlist) > capacidad:
+            shortlist = shortlist[:capacidad]
+            corte = shortlist[-1]["score"]
+        busqueda["shortlist"] = shortlist
+        busqueda["corte"] = corte
+
+        # Si los candidatos modificados bajaron del corte y no quedan k fiables, hay que recalcular
+        grupos = {e["canonical_id"] if COLAPSAR_DUPLICADOS else e["id"] for e in shortlist}
+        if corte is not None and len(grupos) < busqueda["k"] and collection is not None:
+            print(f"🔄 Búsqueda '{busqueda['id']}': quedan menos de {busqueda['k']} candidatos fiables, recalculando completa.")
+            _recalcular(busqueda, collection, model)
+
+    guardar_busquedas(busquedas)
+
+
+def leer_shortlist(id_busqueda):
+    """Lectura O(k) de la shortlist materializada."""
+    busqueda = cargar_busquedas().get(id_busqueda)
+    if busqueda is None:
+        return None
+    top, vistos = [], set()
+    for e in busqueda["shortlist"]:
+        if COLAPSAR_DUPLICADOS and e["canonical_id"] in vistos:
+            continue
+        vistos.add(e["canonical_id"])
+        top.append(e)
+        if len(top) == busqueda["k"]:
+            break
+    return top
+
+
+def menu_busquedas():
+    while True:
+        print("\n" + "═"*60)
+        print(" 📌  BÚSQUEDAS GUARDADAS (REQUISICIONES ABIERTAS)")
+        print("═"*60)
+        busquedas = cargar_busquedas()
+        for b in busquedas.values():
+            print(f"   • {b['id']:<20} | Caso {b['estrategia']} | {b['titulo'][:25]}")
+
+        print("\n1. Crear búsqueda")
+        print("2. Ver shortlist")
+        print("3. Eliminar búsqueda")
+        print("0. Salir")
+        opcion = input("\n👉 Seleccione opción (0-3): ")
+
+        if opcion == '0':
+            break
+        elif opcion == '1':
+            id_busqueda = input("   🏷️  Nombre de la búsqueda: ").strip()
+            titulo = input("   🎯 Título deseado (ej. Software Engineer): ")
+            skills = input("   🎯 Skills deseados (ej. Python, SQL): ")
+            try:
+                experiencia = int(input("   🎯 Años experiencia mínima (ej. 3): "))
+            except ValueError:
+                experiencia = 0
+            try:
+                estrategia = int(input("   🎯 Caso de uso (1-7): "))
+            except ValueError:
+                estrategia = 7
+            if not id_busqueda or estrategia not in PESOS_ESTRATEGIA:
+                print("❌ Nombre vacío o caso de uso inválido.")
+                continue
+            collection, model = conectar_db()
+            crear_busqueda(id_busqueda, titulo, skills, experiencia, estrategia, collection, model)
+            print(f"✅ Búsqueda '{id_busqueda}' guardada.")
+        elif opcion == '2':
+            id_busqueda = input("   🏷️  Nombre de la búsqueda: ").strip()
+            top = leer_shortlist(id_busqueda)
+            if top is None:
+                print("❌ No existe esa búsqueda.")
+                continue
+            print(f"\n🏆 TOP {len(top)} CANDIDATOS - {id_busqueda}:")
+            for idx, e in enumerate(top, start=1):
+                print(f"{idx:>3}. {e['candidato']:<25} | Match: {e['score'] * 100:.1f}% ({e['detalle']})")
+        elif opcion == '3':
+            id_busqueda = input("   🏷️  Nombre de la búsqueda: ").strip()
+            if busquedas.pop(id_busqueda, None) is not None:
+                guardar_busquedas(busquedas)
+                print(f"🗑️  Búsqueda '{id_busqueda}' eliminada.")
+
+
+if __name__ == "__main__":
+    menu_busquedas()
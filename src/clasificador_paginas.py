@@ -0,0 +1,145 @@
+import fitz  # PyMuPDF
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+ESCALA_BAJA = 0.5             # Render de baja resolución (~36 dpi) para clasificar
+ESCALA_OCR_BASE = 2.0         # Escala que se usaba siempre antes del pre-clasificador
+ESCALA_MIN, ESCALA_MAX = 1.0, ESCALA_OCR_BASE   # Nunca por encima de la base: el pre-clasificador solo ahorra
+
+# --- UMBRALES ---
+UMBRAL_PAGINA_BLANCA = 0.001  # Fracción mínima de píxeles con tinta: por debajo la página se omite
+ALTURA_LINEA_MAX_PX = 25      # En el render bajo: más alto que esto es foto/bloque, no renglón
+MIN_TRANSICIONES = 0.03       # Cambios tinta/fondo por píxel de ancho en un renglón de texto
+MIN_FRAGMENTACION = 0.4       # Cambios tinta/fondo por píxel de tinta: trazos de texto (~0.5) vs. manchas (foto, logo)
+ALTURA_LINEA_OBJETIVO_PX = 24 # Altura de renglón deseada en la imagen final para Tesseract
+
+# --- ESTIMACIÓN DE ALTURA DE RENGLÓN ---
+NUM_FRANJAS = 16              # Franjas verticales: en una franja estrecha el skew apenas mueve el renglón
+MIN_FRANJAS_RENGLON = 2       # Franjas seguidas que debe cruzar una banda para ser un renglón
+MIN_RENGLONES_FIABLES = 8     # Renglones sueltos necesarios para cambiar la escala base
+MAX_PEGADOS = 0.1             # Fracción tolerada de bandas con varios renglones pegados
+MAX_DISPERSION = 0.5          # (p75 - p25) / mediana de las alturas de renglón
+UMBRAL_VALLE = 0.35           # Fila interior con menos tinta que esto x el pico: hay dos renglones
+
+
+def _bandas(filas_con_tinta):
+    """Devuelve (inicio, fin) de cada tramo consecutivo de filas con tinta."""
+    bandas, inicio = [], None
+    for y, hay_tinta in enumerate(filas_con_tinta):
+        if hay_tinta and inicio is None:
+            inicio = y
+        elif not hay_tinta and inicio is not None:
+            bandas.append((inicio, y))
+            inicio = None
+    if inicio is not None:
+        bandas.append((inicio, len(filas_con_tinta)))
+    return bandas
+
+
+def _es_pegada(perfil, inicio, fin):
+    """Una banda con un valle interior de tinta son dos renglones muy juntos."""
+    banda = perfil[inicio:fin]
+    nucleo = np.flatnonzero(banda >= UMBRAL_VALLE * banda.max())
+    return banda[nucleo[0]:nucleo[-1] + 1].min() < UMBRAL_VALLE * banda.max()
+
+
+def _enlazadas(a, b):
+    """Misma fila en franjas vecinas: se solapan en vertical y tienen altura parecida."""
+    alto_a, alto_b = a[1] - a[0], b[1] - b[0]
+    return max(a[0], b[0]) < min(a[1], b[1]) and min(alto_a, alto_b) >= 0.5 * max(alto_a, alto_b)
+
+
+def _renglones(tinta):
+    """
+    Perfiles de proyección horizontal por franjas verticales estrechas. Un
+    renglón es una cadena de bandas enlazadas en MIN_FRANJAS_RENGLON franjas
+    consecutivas: el texto sigue en la franja de al lado (aunque esté torcido),
+    la textura de una foto o un logo no. Devuelve (alturas de los renglones
+    sueltos en px, nº de bandas con renglones pegados, nº de renglones).
+    """
+    ancho_franja = max(8, tinta.shape[1] // NUM_FRANJAS)
+    franjas = []   # Por franja: [inicio, fin, pegada, cadena por la izquierda, cadena por la derecha]
+    for x0 in range(0, tinta.shape[1] - ancho_franja + 1, ancho_franja):
+        franja = tinta[:, x0:x0 + ancho_franja]
+        perfil = franja.mean(axis=1)
+        transiciones = np.count_nonzero(np.diff(franja.astype(np.int8), axis=1), axis=1) / ancho_franja
+        bandas = []
+        for inicio, fin in _bandas(perfil > 0):
+            # Un renglón de texto es una banda baja y muy "fragmentada" (muchos trazos)
+            if 2 <= fin - inicio <= ALTURA_LINEA_MAX_PX and transiciones[inicio:fin].mean() >= MIN_TRANSICIONES:
+                bandas.append([inicio, fin, _es_pegada(perfil, inicio, fin), 1, 1])
+        franjas.append(bandas)
+
+    for anterior, actual in zip(franjas, franjas[1:]):
+        for b in actual:
+            b[3] = 1 + max((a[3] for a in anterior if _enlazadas(a, b)), default=0)
+    for siguiente, actual in zip(franjas[::-1], franjas[-2::-1]):
+        for b in actual:
+            b[4] = 1 + max((c[4] for c in siguiente if _enlazadas(b, c)), default=0)
+
+    alturas, pegados, renglones = [], 0, 0
+    for bandas in franjas:
+        for inicio, fin, pegada, izq, der in bandas:
+            if izq + der - 1 < MIN_FRANJAS_RENGLON:
+                continue
+            renglones += izq == 1   # Cada cadena se cuenta en su primera franja
+            if pegada:
+                pegados += 1
+            else:
+                alturas.append(fin - inicio)
+    return alturas, pegados, renglones
+
+
+def clasificar_pagina(pagina):
+    """
+    Decide si una página sin texto digital merece OCR y a qué escala.
+    Usa un render en gris de baja resolución: se omiten las páginas (casi)
+    sin tinta y las que no tienen ningún renglón (fotos, logos, fondos). La
+    escala baja de ESCALA_OCR_BASE únicamente si la altura de renglón medida
+    por franjas es fiable (escaneos torcidos o con interlineado apretado se
+    quedan en la escala base); nunca sube.
+    """
+    pix = pagina.get_pixmap(matrix=fitz.Matrix(ESCALA_BAJA, ESCALA_BAJA), colorspace=fitz.csGRAY)
+    gris = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+
+    # Umbral relativo al fondo: soporta escaneos con papel grisáceo o fondos de color
+    fondo = np.median(gris)
+    tinta = gris < max(0, int(fondo) - 60)
+    densidad = float(tinta.mean())
+
+    area_pagina = abs(pagina.rect) or 1.0
+    area_imagenes = sum(abs(fitz.Rect(info["bbox"]) & pagina.rect) for info in pagina.get_image_info())
+    cobertura = min(1.0, area_imagenes / area_pagina)
+
+    decision = {"ocr": False, "escala": 0.0, "motivo": "", "densidad": densidad,
+                "cobertura_imagen": cobertura, "lineas_texto": 0}
+
+    if densidad < UMBRAL_PAGINA_BLANCA:
+        decision["motivo"] = "blanca"
+        return decision
+
+    alturas, pegados, decision["lineas_texto"] = _renglones(tinta)
+    # Sin renglones solo se omite si la tinta son manchas: texto muy apretado y torcido
+    # no forma bandas, pero sigue siendo trazos cortos
+    fragmentacion = np.count_nonzero(np.diff(tinta.astype(np.int8), axis=1)) / max(1, np.count_nonzero(tinta))
+    if decision["lineas_texto"] == 0 and fragmentacion < MIN_FRAGMENTACION:
+        decision["motivo"] = "imagen" if cobertura > 0.3 else "decorativa"
+        return decision
+
+    decision["ocr"] = True
+    decision["escala"] = ESCALA_OCR_BASE
+    if len(alturas) < MIN_RENGLONES_FIABLES or pegados > MAX_PEGADOS * (len(alturas) + pegados):
+        decision["motivo"] = "sin_estimacion"
+        return decision
+
+    p25, mediana, p75 = np.percentile(alturas, [25, 50, 75])
+    if (p75 - p25) / mediana > MAX_DISPERSION:
+        decision["motivo"] = "sin_estimacion"
+        return decision
+
+    # Escalamos para que el renglón típico mida ~ALTURA_LINEA_OBJETIVO_PX en la imagen final
+    altura_pts = float(p75) / ESCALA_BAJA
+    escala = ALTURA_LINEA_OBJETIVO_PX / altura_pts
+    decision["escala"] = round(min(ESCALA_MAX, max(ESCALA_MIN, escala)), 2)
+    decision["motivo"] = "texto"
+    return decision
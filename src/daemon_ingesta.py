@@ -0,0 +1,358 @@
+import os
+import json
+import time
+import signal
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from extractor_cv import inicializar_worker, extraer_cv
+
+# watchdog (inotify en Linux) es opcional: sin él se usa sondeo del directorio
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_DISPONIBLE = True
+except ImportError:
+    WATCHDOG_DISPONIBLE = False
+
+# Los módulos con efectos de import (Chroma, modelo de embeddings) se importan en
+# DaemonIngesta.__init__: con "spawn" los workers re-importan este archivo y solo
+# deben cargar extractor_cv.
+
+# --- CONFIGURACIÓN ---
+DIRECTORIO_ENTRADA = "./carpeta_cvus_test"
+ARCHIVO_ESTADO = "./candidates_db/estado_daemon.json"      # Para reanudar tras reiniciar
+ARCHIVO_METRICAS = "./candidates_db/metricas_daemon.json"
+
+# --- PARÁMETROS DEL DAEMON ---
+TAM_COLA = 64                   # Cola acotada: si se llena, el watcher espera (backpressure)
+NUM_WORKERS = os.cpu_count() or 1
+DEBOUNCE_SEGUNDOS = 2.0         # Tiempo sin cambios de tamaño/mtime antes de procesar
+INTERVALO_SONDEO = 2.0
+INTERVALO_METRICAS = 10.0       # Cada cuánto se guardan estado, índice LSH y métricas
+VENTANA_LATENCIAS = 500
+MAX_REINTENTOS = 2              # Veces que se reencola un CV si el pool de procesos se rompe
+
+
+def _firma_archivo(ruta):
+    st = os.stat(ruta)
+    return [st.st_size, st.st_mtime]
+
+
+class DaemonIngesta:
+    def __init__(self):
+        import gestor_cvu
+        from deduplicador import IndiceLSH
+        from busquedas_guardadas import actualizar_busquedas
+        self.gestor = gestor_cvu
+        self.actualizar_busquedas = actualizar_busquedas
+        self.collection = gestor_cvu.chroma_client.get_or_create_collection(name=gestor_cvu.COLLECTION_NAME)
+        self.indice = IndiceLSH()
+        self.estado = self._cargar_estado()     # archivo -> [tamaño, mtime] ya indexado
+        self.pendientes = {}                    # ruta -> {"llegada", "firma", "estable_desde"}
+        self.en_cola = set()
+        self.reintentos = {}                    # ruta -> veces reencolada por caída del pool
+        self.pool_cpu = None
+        self.delta = {}                         # id -> metadatos indexados desde el último guardado
+        self.latencias = deque(maxlen=VENTANA_LATENCIAS)
+        self.procesados = 0
+        self.errores = 0
+        self.en_proceso = 0
+        self.parada = None
+        self.cola = None
+
+    # --- ESTADO PERSISTENTE ---
+    def _cargar_estado(self):
+        if not os.path.exists(ARCHIVO_ESTADO):
+            return {}
+        try:
+            with open(ARCHIVO_ESTADO, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _guardar_json(self, ruta, datos):
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        tmp = ruta + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+        os.replace(tmp, ruta)
+
+    def _persistir(self):
+        """Corre en el hilo de indexado: guarda índice LSH, estado y shortlists."""
+        self.indice.guardar()
+        self._guardar_json(ARCHIVO_ESTADO, dict(self.estado))
+        # Si las shortlists fallan, el delta se conserva y se reintenta en el próximo ciclo
+        if self.delta:
+            self.actualizar_busquedas(list(self.delta), list(self.delta.values()),
+                                      self.gestor.embedding_model, self.collection)
+            self.delta = {}
+
+    # --- DETECCIÓN DE ARCHIVOS ---
+    def notificar(self, ruta, llegada=None):
+        """Registra una llegada o modificación; el debounce decide cuándo encolar."""
+        if not ruta.lower().endswith(".pdf"):
+            return
+        if ruta not in self.pendientes:
+            self.pendientes[ruta] = {"llegada": llegada or time.time(), "firma": None, "estable_desde": None}
+
+    def escanear_directorio(self):
+        """Encola lo que no coincide con el estado guardado (arranque y modo sondeo)."""
+        for archivo in os.listdir(DIRECTORIO_ENTRADA):
+            ruta = os.path.join(DIRECTORIO_ENTRADA, archivo)
+            if not archivo.lower().endswith(".pdf") or ruta in self.en_cola:
+                continue
+            try:
+                firma = _firma_archivo(ruta)
+            except OSError:
+                continue
+            if self.estado.get(archivo) != firma:
+                self.notificar(ruta)
+
+    async def sondear(self):
+        while not self.parada.is_set():
+            self.escanear_directorio()
+            await asyncio.sleep(INTERVALO_SONDEO)
+
+    async def debounce(self):
+        """Pasa a la cola los archivos cuyo tamaño y mtime llevan DEBOUNCE_SEGUNDOS sin cambiar."""
+        while not self.parada.is_set():
+            ahora = time.time()
+            for ruta, info in list(self.pendientes.items()):
+                try:
+                    firma = _firma_archivo(ruta)
+                except OSError:
+                    del self.pendientes[ruta]   # Se borró antes de terminar de escribirse
+                    continue
+                if firma != info["firma"]:
+                    info["firma"], info["estable_desde"] = firma, ahora
+                    continue
+                if ahora - info["estable_desde"] < DEBOUNCE_SEGUNDOS or ruta in self.en_cola:
+                    continue
+                del self.pendientes[ruta]
+                self.en_cola.add(ruta)
+                await self.cola.put((ruta, firma, info["llegada"]))   # Bloquea si la cola está llena
+                if self.parada.is_set():
+                    return
+            await asyncio.sleep(0.5)
+
+    # --- PROCESAMIENTO ---
+    def _indexar(self, ruta, firma, texto_full, meta):
+        archivo = os.path.basename(ruta)
+        if self.gestor.indexar_cv(self.collection, self.indice, archivo, texto_full, meta):
+            self.delta[archivo] = meta   # Reindexado dos veces en el intervalo: gana la última versión
+        self.estado[archivo] = firma
+
+    def _crear_pool_cpu(self, num_workers=NUM_WORKERS):
+        # "spawn" en todas las plataformas: los workers no heredan Chroma ni el modelo de embeddings
+        return ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=inicializar_worker)
+
+    def _reconstruir_pool_cpu(self, pool_roto):
+        # Varios workers ven la misma caída: solo el primero reconstruye
+        if self.pool_cpu is pool_roto:
+            print("⚠️ Un proceso del pool murió (¿memoria?). Recreando el pool de extracción...")
+            pool_roto.shutdown(wait=False, cancel_futures=True)
+            self.pool_cpu = self._crear_pool_cpu()
+
+    def _marcar_error(self, ruta, firma, mensaje):
+        # Error real de extracción: no se reintenta hasta que el archivo cambie
+        self.errores += 1
+        self.estado[os.path.basename(ruta)] = firma
+        self.reintentos.pop(ruta, None)
+        print(mensaje)
+
+    async def _extraer_aislado(self, ruta):
+        """
+        Repite la extracción de un CV en un proceso propio para saber si es él
+        quien tumba el pool. Devuelve (culpable, resultado); culpable es None si
+        ni siquiera arranca un worker (fallo general, no del archivo).
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._crear_pool_cpu(num_workers=1)
+        try:
+            try:
+                await loop.run_in_executor(pool, os.getpid)
+            except BrokenProcessPool:
+                return None, None
+            try:
+                return False, await loop.run_in_executor(pool, extraer_cv, ruta)
+            except BrokenProcessPool:
+                return True, None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def worker(self, pool_indexado):
+        loop = asyncio.get_running_loop()
+        while not self.parada.is_set():
+            try:
+                ruta, firma, llegada = await asyncio.wait_for(self.cola.get(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            self.en_proceso += 1
+            archivo = os.path.basename(ruta)
+            try:
+                pool = self.pool_cpu
+                try:
+                    texto_full, meta = await loop.run_in_executor(pool, extraer_cv, ruta)
+                except BrokenProcessPool:
+                    self._reconstruir_pool_cpu(pool)
+                    self.reintentos[ruta] = self.reintentos.get(ruta, 0) + 1
+                    if self.reintentos[ruta] <= MAX_REINTENTOS:
+                        # Puede no ser culpa de este CV: vuelve a pasar por el debounce
+                        self.notificar(ruta, llegada)
+                        continue
+                    try:
+                        culpable, resultado = await self._extraer_aislado(ruta)
+                    except Exception as e:
+                        self._marcar_error(ruta, firma, f"❌ Error en {archivo}: {e}")
+                        continue
+                    if culpable is None:
+                        # Ningún worker arranca: no se culpa al archivo, se reintenta más tarde
+                        print(f"⚠️ El pool de extracción no arranca. {archivo} se reintentará.")
+                        self.reintentos.pop(ruta, None)
+                        await asyncio.sleep(INTERVALO_METRICAS)
+                        self.notificar(ruta, llegada)
+                        continue
+                    if culpable:
+                        # Tumba también un proceso dedicado: se trata como error del archivo
+                        self._marcar_error(ruta, firma, f"❌ {archivo} rompe el proceso de extracción. "
+                                                        f"Se omite hasta que cambie.")
+                        continue
+                    texto_full, meta = resultado
+                except Exception as e:
+                    self._marcar_error(ruta, firma, f"❌ Error en {archivo}: {e}")
+                    continue
+                self.reintentos.pop(ruta, None)
+
+                try:
+                    # Chroma y el índice LSH se tocan desde un único hilo
+                    await loop.run_in_executor(pool_indexado, self._indexar, ruta, firma, texto_full, meta)
+                except Exception as e:
+                    # Fallo de indexado (no del archivo): sin estado, se reintenta en el próximo escaneo
+                    self.errores += 1
+                    print(f"❌ Error indexando {archivo}: {e}")
+                    continue
+                self.latencias.append(time.time() - llegada)
+                self.procesados += 1
+                print(f"✅ {meta['candidate_name']:<30} | {archivo} | {self.latencias[-1]:.1f}s")
+            finally:
+                self.en_proceso -= 1
+                self.en_cola.discard(ruta)
+                self.cola.task_done()
+
+    def metricas(self):
+        lat = sorted(self.latencias)
+        percentil = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] if lat else 0.0
+        return {
+            "timestamp": time.time(),
+            "cola": self.cola.qsize(),
+            "pendientes_debounce": len(self.pendientes),
+            "en_proceso": self.en_proceso,
+            "procesados": self.procesados,
+            "errores": self.errores,
+            "latencia_p50_s": round(percentil(0.50), 2),
+            "latencia_p95_s": round(percentil(0.95), 2),
+        }
+
+    async def reportar(self, pool_indexado):
+        loop = asyncio.get_running_loop()
+        while not self.parada.is_set():
+            try:
+                await asyncio.wait_for(self.parada.wait(), timeout=INTERVALO_METRICAS)
+            except asyncio.TimeoutError:
+                pass
+            # Un ciclo fallido (disco lleno, JSON corrupto...) no detiene los siguientes
+            try:
+                await loop.run_in_executor(pool_indexado, self._persistir)
+            except Exception as e:
+                print(f"❌ Error guardando estado/shortlists: {e}")
+            m = self.metricas()
+            try:
+                self._guardar_json(ARCHIVO_METRICAS, m)
+            except Exception as e:
+                print(f"❌ Error guardando métricas: {e}")
+            print(f"📊 Cola: {m['cola']}/{TAM_COLA} | Debounce: {m['pendientes_debounce']} | "
+                  f"En proceso: {m['en_proceso']} | Latencia p50/p95: {m['latencia_p50_s']}s/{m['latencia_p95_s']}s")
+
+    async def ejecutar(self):
+        loop = asyncio.get_running_loop()
+        self.parada = asyncio.Event()
+        self.cola = asyncio.Queue(maxsize=TAM_COLA)
+        os.makedirs(DIRECTORIO_ENTRADA, exist_ok=True)
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.parada.set)
+            except (NotImplementedError, RuntimeError):
+                pass   # Windows: se usa KeyboardInterrupt
+
+        # Reanudación: todo lo que llegó o cambió mientras el daemon estaba parado
+        self.escanear_directorio()
+
+        observer = None
+        tareas_watch = []
+        if WATCHDOG_DISPONIBLE:
+            daemon = self
+
+            class Manejador(FileSystemEventHandler):
+                def on_created(self, event):
+                    if not event.is_directory:
+                        loop.call_soon_threadsafe(daemon.notificar, event.src_path)
+
+                def on_modified(self, event):
+                    self.on_created(event)
+
+                def on_moved(self, event):
+                    if not event.is_directory:
+                        loop.call_soon_threadsafe(daemon.notificar, event.dest_path)
+
+            observer = Observer()
+            observer.schedule(Manejador(), DIRECTORIO_ENTRADA, recursive=False)
+            observer.start()
+            print(f"👀 Vigilando '{DIRECTORIO_ENTRADA}' con eventos del sistema de archivos.")
+        else:
+            tareas_watch.append(asyncio.create_task(self.sondear()))
+            print(f"👀 Vigilando '{DIRECTORIO_ENTRADA}' por sondeo cada {INTERVALO_SONDEO}s (instala 'watchdog' para inotify).")
+
+        self.pool_cpu = self._crear_pool_cpu()
+        pool_indexado = ThreadPoolExecutor(max_workers=1)
+        tareas = tareas_watch + [asyncio.create_task(self.debounce()),
+                                 asyncio.create_task(self.reportar(pool_indexado))]
+        tareas += [asyncio.create_task(self.worker(pool_indexado)) for _ in range(NUM_WORKERS)]
+
+        try:
+            await self.parada.wait()
+        finally:
+            print("\n🛑 Deteniendo daemon: se terminan los CVs en curso...")
+            self.parada.set()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            # El debounce puede estar bloqueado en cola.put(): hacemos sitio para que vea la parada
+            while not self.cola.empty():
+                self.cola.get_nowait()
+                self.cola.task_done()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            # Lo que quedó sin indexar no está en el estado y se reencola al reiniciar
+            try:
+                await loop.run_in_executor(pool_indexado, self._persistir)
+            except Exception as e:
+                print(f"❌ Error guardando el estado final: {e}")
+            self.pool_cpu.shutdown(wait=True)
+            pool_indexado.shutdown(wait=True)
+            print(f"💾 Estado guardado. Procesados: {self.procesados} | Errores: {self.errores}")
+
+
+def main():
+    print(f"--- DAEMON DE INGESTA ({NUM_WORKERS} workers, cola máx. {TAM_COLA}) ---")
+    try:
+        asyncio.run(DaemonIngesta().ejecutar())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import zlib
+import base64
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+ARCHIVO_INDICE_LSH = "./candidates_db/indice_lsh.json"
+
+# PARÁMETROS MINHASH / LSH
+NUM_PERMUTACIONES = 128   # Longitud de la firma MinHash
+NUM_BANDAS = 21           # 21 bandas x 6 filas (126 de 128) -> umbral LSH aprox (1/21)^(1/6) ≈ 0.60
+FILAS_POR_BANDA = 6
+TAM_SHINGLE = 5           # Shingles de 5 caracteres: un error de OCR solo rompe los que lo contienen
+UMBRAL_JACCARD = 0.75     # Similitud estimada mínima para considerar duplicado
+SEMILLA = 42
+
+# Identifica el formato de las firmas guardadas; si cambia, el índice se descarta
+VERSION_FIRMAS = f"char{TAM_SHINGLE}-{NUM_PERMUTACIONES}-{SEMILLA}"
+
+# Primo de Mersenne 2^31-1: con hashes de 32 bits el producto a*x cabe en uint64
+PRIMO = np.uint64((1 << 31) - 1)
+
+_rng = np.random.RandomState(SEMILLA)
+_COEF_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERMUTACIONES).astype(np.uint64)
+_COEF_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERMUTACIONES).astype(np.uint64)
+
+
+def _normalizar(texto):
+    """Minúsculas, sin puntuación y con un solo espacio: así el PDF digital y su OCR se parecen."""
+    return " ".join(re.findall(r'\w+', texto.lower()))
+
+
+def _shingles(texto):
+    """Conjunto de hashes (32 bits) de los n-gramas de caracteres del texto normalizado."""
+    normalizado = _normalizar(texto)
+    if not normalizado:
+        return set()
+    if len(normalizado) < TAM_SHINGLE:
+        return {zlib.crc32(normalizado.encode('utf-8'))}
+    return {
+        zlib.crc32(normalizado[i:i + TAM_SHINGLE].encode('utf-8'))
+        for i in range(len(normalizado) - TAM_SHINGLE + 1)
+    }
+
+
+def calcular_firma(texto):
+    """
+    Firma MinHash del texto: para cada permutación h(x) = (a*x + b) mod p
+    guardamos el mínimo sobre todos los shingles. Devuelve None si no hay texto.
+    """
+    hashes = _shingles(texto)
+    if not hashes:
+        return None
+    x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    # Procesamos en bloques para no crear matrices enormes con CVs muy largos
+    firma = np.full(NUM_PERMUTACIONES, PRIMO, dtype=np.uint64)
+    for i in range(0, len(x), 4096):
+        bloque = x[i:i + 4096]
+        valores = (_COEF_A[:, None] * bloque[None, :] + _COEF_B[:, None]) % PRIMO
+        firma = np.minimum(firma, valores.min(axis=1))
+    return firma.astype(np.uint32)
+
+
+def similitud_estimada(firma_a, firma_b):
+    """Fracción de posiciones iguales = estimación de Jaccard entre los dos textos."""
+    return float(np.mean(firma_a == firma_b))
+
+
+class IndiceLSH:
+    """
+    Índice LSH por bandas sobre firmas MinHash. Cada firma se corta en
+    NUM_BANDAS trozos; dos CVs son candidatos a duplicado si coinciden en
+    al menos una banda, así que la búsqueda no recorre toda la colección.
+    """
+
+    def __init__(self, ruta=ARCHIVO_INDICE_LSH):
+        self.ruta = ruta
+        self.filas_por_banda = FILAS_POR_BANDA
+        self.firmas = {}      # doc_id -> firma (np.uint32)
+        self.canonicos = {}   # doc_id -> id canónico del grupo
+        self.cubetas = {}     # (banda, bytes de la banda) -> set(doc_id)
+        self._cargar()
+
+    def _claves_bandas(self, firma):
+        r = self.filas_por_banda
+        return [(b, firma[b * r:(b + 1) * r].tobytes()) for b in range(NUM_BANDAS)]
+
+    def _cargar(self):
+        if not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Índice LSH ilegible ({e}). Se empieza vacío.")
+            return
+        if datos.get('version') != VERSION_FIRMAS:
+            print("⚠️ Índice LSH con otro formato de firmas. Se empieza vacío (reconstruye con gestor_cvu.py).")
+            return
+        for doc_id, firma_b64 in datos.get('firmas', {}).items():
+            firma = np.frombuffer(base64.b64decode(firma_b64), dtype=np.uint32)
+            self._indexar(doc_id, firma, datos['canonicos'].get(doc_id, doc_id))
+
+    def _indexar(self, doc_id, firma, canonico):
+        self.firmas[doc_id] = firma
+        self.canonicos[doc_id] = canonico
+        for clave in self._claves_bandas(firma):
+            self.cubetas.setdefault(clave, set()).add(doc_id)
+
+    def buscar_duplicado(self, firma, excluir=None):
+        """
+        Devuelve (id_canonico, similitud) del CV más parecido por encima de
+        UMBRAL_JACCARD, o (None, 0.0) si no hay ninguno.
+        """
+        candidatos = set()
+        for clave in self._claves_bandas(firma):
+            candidatos |= self.cubetas.get(clave, set())
+        candidatos.discard(excluir)
+
+        mejor_id, mejor_sim = None, 0.0
+        for doc_id in candidatos:
+            sim = similitud_estimada(firma, self.firmas[doc_id])
+            if sim > mejor_sim:
+                mejor_id, mejor_sim = doc_id, sim
+
+        if mejor_id is None or mejor_sim < UMBRAL_JACCARD:
+            return None, 0.0
+        return self.canonicos[mejor_id], mejor_sim
+
+    def registrar(self, doc_id, firma, canonico=None):
+        self.eliminar(doc_id)
+        self._indexar(doc_id, firma, canonico or doc_id)
+
+    def eliminar(self, doc_id):
+        firma = self.firmas.pop(doc_id, None)
+        self.canonicos.pop(doc_id, None)
+        if firma is None:
+            return
+        for clave in self._claves_bandas(firma):
+            grupo = self.cubetas.get(clave)
+            if grupo:
+                grupo.discard(doc_id)
+                if not grupo:
+                    del self.cubetas[clave]
+
+    def vaciar(self):
+        self.firmas.clear()
+        self.canonicos.clear()
+        self.cubetas.clear()
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
+
+    def guardar(self):
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        datos = {
+            'version': VERSION_FIRMAS,
+            'firmas': {k: base64.b64encode(v.tobytes()).decode('ascii') for k, v in self.firmas.items()},
+            'canonicos': self.canonicos,
+        }
+        tmp = self.ruta + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        os.replace(tmp, self.ruta)
@@ -2,7 +2,7 @@ import chromadb
 from sentence_transformers import SentenceTransformer, util
 import pandas as pd
 from tabulate import tabulate
-import random
+from acceso_datos import muestrear_ids
 
 # --- CONFIGURACIÓN ---
 CHROMA_DB_PATH = "./candidates_db"
@@ -39,20 +39,18 @@ def evaluar_similitud(texto_candidato, texto_objetivo, model):
 def ejecutar_motor_inferencia():
     collection, model = cargar_contexto()
 
-    # 1. RECUPERAR TODOS LOS IDs DISPONIBLES
-    todos_los_ids = collection.get(include=[])['ids']
-    total_documentos = len(todos_los_ids)
+    # 1. CONTAR LOS DOCUMENTOS DISPONIBLES (sin listar todos los IDs)
+    total_documentos = collection.count()
 
     if total_documentos == 0:
         print("📭 La base de datos está vacía. Carga documentos con 'ingesta_cvu.py'.")
         return
 
     # 2. SELECCIONAR LA MUESTRA ALEATORIA
+    ids_muestra = muestrear_ids(collection, N_MUESTRA)
     if N_MUESTRA >= total_documentos:
-        ids_muestra = todos_los_ids
         print(f"⚠️ Muestra ({N_MUESTRA}) es mayor al total ({total_documentos}). Usando todos los documentos.")
     else:
-        ids_muestra = random.sample(todos_los_ids, N_MUESTRA)
         print(f"✅ Se seleccionó una muestra aleatoria de {len(ids_muestra)} documentos (N={N_MUESTRA}).")
 
     # 3. RECUPERAR SOLO LOS METADATOS DE LA MUESTRA
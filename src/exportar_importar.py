@@ -0,0 +1,153 @@
+import sys
+import json
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import chromadb
+from sentence_transformers import SentenceTransformer
+from acceso_datos import iterar_coleccion
+from almacen_textos import resolver_documento, guardar_texto, ZSTD_DISPONIBLE
+from deduplicador import IndiceLSH, calcular_firma
+from busquedas_guardadas import cargar_busquedas, reiniciar_shortlists, actualizar_busquedas
+
+# --- CONFIGURACIÓN ---
+CHROMA_DB_PATH = "./candidates_db"
+COLLECTION_NAME = "cvu_candidatos"
+ARCHIVO_EXPORT = "candidatos.parquet"
+
+# --- PARÁMETROS ---
+TAM_LOTE = 1000          # Filas por lote (lectura de Chroma, row group de Parquet e inserción)
+COMPRESION = "zstd"      # Compresión de las columnas Parquet
+
+
+def _esquema(dim, con_texto):
+    campos = [
+        pa.field("id", pa.string()),
+        pa.field("metadata", pa.string()),            # JSON: las claves varían entre CVs
+        pa.field("embedding", pa.list_(pa.float32(), dim)),
+    ]
+    if con_texto:
+        campos.append(pa.field("texto", pa.string()))
+    return pa.schema(campos)
+
+
+def exportar(ruta=ARCHIVO_EXPORT, con_texto=False):
+    """
+    Vuelca ids, metadatos, embeddings y (opcionalmente) el texto completo a
+    Parquet, lote a lote: nunca hay más de TAM_LOTE candidatos en memoria.
+    """
+    client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    collection = client.get_collection(name=COLLECTION_NAME)
+    include = ("metadatas", "embeddings", "documents") if con_texto else ("metadatas", "embeddings")
+
+    t0 = time.time()
+    writer = None
+    total = 0
+    try:
+        for pagina in iterar_coleccion(collection, include, TAM_LOTE):
+            embs = np.asarray(pagina['embeddings'], dtype=np.float32)
+            if writer is None:
+                esquema = _esquema(embs.shape[1], con_texto)
+                writer = pq.ParquetWriter(ruta, esquema, compression=COMPRESION)
+
+            columnas = [
+                pa.array(pagina['ids'], pa.string()),
+                pa.array([json.dumps(m or {}, ensure_ascii=False) for m in pagina['metadatas']], pa.string()),
+                pa.FixedSizeListArray.from_arrays(pa.array(embs.ravel(), pa.float32()), embs.shape[1]),
+            ]
+            if con_texto:
+                # El export es autocontenido: las referencias al almacén externo se resuelven
+                columnas.append(pa.array([resolver_documento(d) for d in pagina['documents']], pa.string()))
+
+            writer.write_table(pa.Table.from_arrays(columnas, schema=esquema))
+            total += len(pagina['ids'])
+            print(f"   📤 {total} candidatos exportados...", end="\r")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if total == 0:
+        print("📭 Base de datos vacía. No se generó archivo.")
+        return
+    segundos = time.time() - t0
+    print(f"\n✅ Export '{ruta}': {total} candidatos en {segundos:.1f}s ({total / max(segundos, 1e-9):.0f}/s)")
+
+
+def importar(ruta=ARCHIVO_EXPORT, almacen_externo=False, forzar=False):
+    """
+    Carga un export Parquet en una colección vacía sin recalcular OCR, NLP ni
+    embeddings. Se lee por lotes con iter_batches, así la memoria se mantiene plana.
+    Las búsquedas guardadas se mantienen con el mismo delta por lote que la ingesta.
+    """
+    client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    collection = client.get_or_create_collection(name=COLLECTION_NAME)
+    vacia = collection.count() == 0
+    if not vacia and not forzar:
+        print(f"❌ La colección '{COLLECTION_NAME}' ya tiene {collection.count()} candidatos. "
+              f"Usa una base vacía o '--forzar' para hacer upsert encima.")
+        return
+    if almacen_externo and not ZSTD_DISPONIBLE:
+        print("⚠️ 'zstandard' no está instalado: los textos se guardarán dentro de Chroma.")
+        almacen_externo = False
+
+    archivo = pq.ParquetFile(ruta)
+    con_texto = "texto" in archivo.schema_arrow.names
+    dim = archivo.schema_arrow.field("embedding").type.list_size
+
+    indice = IndiceLSH()
+    if vacia:
+        # Lo que quede de una base anterior no corresponde a estos candidatos
+        indice.vaciar()
+        reiniciar_shortlists()
+    # Con --forzar las shortlists existentes siguen valiendo: cada lote se fusiona como un upsert
+    model = SentenceTransformer('all-MiniLM-L6-v2') if cargar_busquedas() else None
+
+    t0 = time.time()
+    total = 0
+    for lote in archivo.iter_batches(batch_size=TAM_LOTE):
+        ids = lote.column("id").to_pylist()
+        metas = [json.loads(m) for m in lote.column("metadata").to_pylist()]
+        # Acceso directo al buffer de floats, sin pasar por listas de Python
+        embs = lote.column("embedding").values.to_numpy(zero_copy_only=False).reshape(-1, dim)
+
+        documentos = None
+        if con_texto:
+            textos = lote.column("texto").to_pylist()
+            documentos = [guardar_texto(t) for t in textos] if almacen_externo else textos
+            # Las firmas MinHash son baratas: se reconstruye el índice de duplicados
+            for doc_id, texto, meta in zip(ids, textos, metas):
+                firma = calcular_firma(texto or "")
+                if firma is not None:
+                    indice.registrar(doc_id, firma, meta.get('canonical_id', doc_id))
+        else:
+            # Sin texto no hay firma: la de una versión anterior del CV ya no vale
+            for doc_id in ids:
+                indice.eliminar(doc_id)
+
+        collection.upsert(ids=ids, embeddings=embs, metadatas=metas, documents=documentos)
+        if model is not None:
+            actualizar_busquedas(ids, metas, model, collection)
+        total += len(ids)
+        print(f"   📥 {total} candidatos importados...", end="\r")
+
+    indice.guardar()
+    segundos = time.time() - t0
+    print(f"\n✅ Import '{ruta}': {total} candidatos en {segundos:.1f}s ({total / max(segundos, 1e-9):.0f}/s)")
+    if not con_texto:
+        print("💡 El export no incluía texto: estos candidatos no entran en el índice de duplicados ni en la vista de detalle.")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opciones = {a for a in sys.argv[1:] if a.startswith("--")}
+    if not args or args[0] not in ("exportar", "importar"):
+        print("Uso: python exportar_importar.py exportar [archivo.parquet] [--con-texto]")
+        print("     python exportar_importar.py importar [archivo.parquet] [--almacen-externo] [--forzar]")
+        exit()
+
+    ruta = args[1] if len(args) > 1 else ARCHIVO_EXPORT
+    if args[0] == "exportar":
+        exportar(ruta, con_texto="--con-texto" in opciones)
+    else:
+        importar(ruta, almacen_externo="--almacen-externo" in opciones, forzar="--forzar" in opciones)
@@ -0,0 +1,187 @@
+import os
+import re
+import signal
+import fitz  # PyMuPDF
+import spacy
+from motor_ocr import crear_motor_ocr, NUM_WORKERS_OCR
+from clasificador_paginas import clasificar_pagina, ESCALA_OCR_BASE
+
+# Extracción OCR + NLP de un CV. Este módulo no abre Chroma ni carga el modelo
+# de embeddings, así que se puede importar barato desde procesos worker.
+
+# --- CONFIGURACIÓN ---
+# Pre-clasificar páginas escaneadas: omitir las blancas y elegir la escala de OCR
+PRECLASIFICAR_PAGINAS = True
+
+_modelos_nlp = None
+_extractor_worker = None
+
+
+def cargar_modelos_nlp():
+    """Carga (una vez por proceso) los modelos de spaCy en español e inglés."""
+    global _modelos_nlp
+    if _modelos_nlp is None:
+        print("⏳ Cargando modelos de NLP...")
+        try:
+            _modelos_nlp = (spacy.load("es_core_news_md"), spacy.load("en_core_web_md"))
+        except:
+            print("❌ Error: Debes instalar los modelos de spacy.")
+            print("Ejecuta: python -m spacy download es_core_news_md")
+            print("Ejecuta: python -m spacy download en_core_web_md")
+            exit()
+    return _modelos_nlp
+
+
+def inicializar_worker():
+    """Initializer de pools de procesos: un solo motor OCR por worker y Ctrl+C solo en el padre."""
+    global _extractor_worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _extractor_worker = ExtractorPro(num_workers_ocr=1)
+
+
+def extraer_cv(ruta):
+    """Tarea de worker: OCR + NLP de un PDF con el extractor del proceso."""
+    return _extractor_worker.procesar_cv(ruta)
+
+
+class ExtractorPro:
+    def __init__(self, num_workers_ocr=NUM_WORKERS_OCR):
+        self.nlp_es, self.nlp_en = cargar_modelos_nlp()
+        # Motor OCR de larga vida: los idiomas se cargan una sola vez
+        self.motor_ocr = crear_motor_ocr(num_workers=num_workers_ocr)
+        self.estadisticas = {"paginas": 0, "digitales": 0, "ocr": 0, "omitidas": 0, "reducidas": 0}
+
+        self.titulos_conocidos = [
+            "ingeniero", "engineer", "developer", "desarrollador", "programador",
+            "architect", "arquitecto", "manager", "gerente", "analyst", "analista",
+            "scientist", "científico", "administrator", "administrador", "technician",
+            "técnico", "consultant", "consultor", "director", "coordinator", "coordinador",
+            "specialist", "especialista", "designer", "diseñador", "bachelor", "licenciado",
+            "master", "maestría", "phd", "doctorado"
+        ]
+
+        self.skills_conocidas = [
+            "python", "java", "javascript", "typescript", "sql", "nosql", "aws", "azure", 
+            "docker", "kubernetes", "react", "angular", "vue", "node", "django", "flask",
+            "git", "linux", "excel", "power bi", "tableau", "salesforce", "sap",
+            "leadership", "liderazgo", "communication", "comunicación", "english", "inglés",
+            "agile", "scrum", "kanban", "marketing", "sales", "ventas"
+        ]
+
+    def _ocr_hibrido(self, pagina):
+        # Usamos "blocks" para respetar columnas, pero get_text("blocks") devuelve tuplas
+        # Para OCR necesitamos imagen. Esta función decide qué método usar.
+        self.estadisticas["paginas"] += 1
+        texto = pagina.get_text().strip()
+        if len(texto) > 50: 
+            self.estadisticas["digitales"] += 1
+            return "DIGITAL" # Marcador para indicar que usemos extracción digital
+        
+        escala = ESCALA_OCR_BASE
+        if PRECLASIFICAR_PAGINAS:
+            decision = clasificar_pagina(pagina)
+            if not decision["ocr"]:
+                self.estadisticas["omitidas"] += 1
+                return ""
+            escala = decision["escala"]
+            if escala < ESCALA_OCR_BASE:
+                self.estadisticas["reducidas"] += 1
+
+        # OCR Fallback: devolvemos el render para reconocerlo en lote con el motor OCR
+        self.estadisticas["ocr"] += 1
+        return pagina.get_pixmap(matrix=fitz.Matrix(escala, escala))
+
+    def extraer_texto_ordenado(self, ruta_pdf):
+        """
+        Usa lógica de BLOQUES para leer columnas correctamente.
+        """
+        partes = []
+        paginas_ocr = []  # (posición en partes, pixmap)
+        with fitz.open(ruta_pdf) as doc:
+            for pagina in doc:
+                res_ocr = self._ocr_hibrido(pagina)
+                
+                if isinstance(res_ocr, str) and res_ocr == "DIGITAL":
+                    # Extraer bloques de texto ordenados por posición (arriba->abajo, izq->der)
+                    # Esto evita mezclar columnas.
+                    bloques = pagina.get_text("blocks", sort=True)
+                    # b[4] contiene el texto del bloque
+                    partes.append("".join(b[4] + "\n" for b in bloques))
+                elif isinstance(res_ocr, str):
+                    # Página sin nada que leer según el pre-clasificador
+                    partes.append(res_ocr)
+                else:
+                    paginas_ocr.append((len(partes), res_ocr))
+                    partes.append("")
+
+        # Es OCR: todas las páginas escaneadas del CV van juntas al pool del motor
+        textos = self.motor_ocr.reconocer_lote([pix for _, pix in paginas_ocr])
+        for (posicion, _), texto in zip(paginas_ocr, textos):
+            partes[posicion] = texto + "\n"
+        return "".join(partes)
+
+    def extraer_nombre_con_nlp(self, texto):
+        """
+        Usa Inteligencia Artificial (spaCy) para encontrar personas.
+        """
+        # Tomamos solo el inicio del texto para buscar el nombre (primeros 500 caracteres)
+        inicio_texto = texto[:800]
+        
+        # Limpieza básica
+        inicio_texto = inicio_texto.replace('\n', ' ').strip()
+        
+        # Procesamos con ambos modelos (ES y EN) por si el CV está en inglés
+        docs = [self.nlp_es(inicio_texto), self.nlp_en(inicio_texto)]
+        
+        candidatos_nombre = []
+
+        for doc in docs:
+            for ent in doc.ents:
+                # Buscamos entidades etiquetadas como PER (Persona)
+                if ent.label_ == "PER" or ent.label_ == "PERSON":
+                    nombre = ent.text.strip().title()
+                    # Filtros extra de seguridad
+                    if "Curriculum" in nombre or "Resume" in nombre or "Cv" in nombre: continue
+                    if len(nombre.split()) < 2: continue # Un nombre suele tener Nombre+Apellido
+                    if len(nombre) > 40: continue
+                    if any(char.isdigit() for char in nombre): continue
+                    
+                    candidatos_nombre.append(nombre)
+
+        if candidatos_nombre:
+            # Retornamos el primero encontrado (suelen aparecer arriba)
+            return candidatos_nombre[0]
+            
+        return "Unknown Candidate"
+
+    def extraer_experiencia_regex(self, texto):
+        # Regex más estricto: Busca números de 1 o 2 dígitos seguidos explícitamente de "años" o "years"
+        # Ignora fechas como "2015-2018" (que dan 2000 años de experiencia si no se cuida)
+        texto_lower = texto.lower()
+        patron = r'(\d{1,2})\+?\s*(?:años|years|yrs|ans)\s+(?:de\s+)?(?:experiencia|experience)?'
+        
+        coincidencias = re.findall(patron, texto_lower)
+        numeros = [int(x) for x in coincidencias if int(x) < 50] # Filtramos errores (nadie tiene 99 años exp)
+        
+        return max(numeros) if numeros else 0
+
+    def procesar_cv(self, ruta_archivo):
+        texto = self.extraer_texto_ordenado(ruta_archivo)
+        
+        # 1. Extracción de Nombre con IA
+        nombre = self.extraer_nombre_con_nlp(texto)
+        
+        # 2. Extracción de Experiencia mejorada
+        anios = self.extraer_experiencia_regex(texto)
+        
+        # 3. Skills y Títulos (Búsqueda difusa simple)
+        texto_lower = texto.lower()
+        skills = list(set([s for s in self.skills_conocidas if s in texto_lower]))
+        titulos = list(set([t for t in self.titulos_conocidos if t in texto_lower]))
+        
+        return texto, {
+            "candidate_name": nombre,
+            "years_experience": anios,
+            "skills": ", ".join(skills),
+            "titles": ", ".join(titulos)
+        }
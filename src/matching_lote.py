@@ -0,0 +1,246 @@
+import os
+import sys
+import csv
+import json
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from buscador_candidato import conectar_db, COLAPSAR_DUPLICADOS
+from acceso_datos import iterar_metadatos
+
+# --- CONFIGURACIÓN ---
+ARCHIVO_REQUISICIONES = "requisiciones.csv"   # CSV o JSON (se puede pasar como argumento)
+DIRECTORIO_SALIDA = "./shortlists"
+TOP_K = 10
+ESTRATEGIA_POR_DEFECTO = 7
+
+# --- RENDIMIENTO ---
+MEMORIA_MAX_MB = 512            # Tope total para las matrices de scores en memoria
+NUM_HILOS = os.cpu_count() or 1
+BLOQUE_TRABAJOS = 16            # Requisiciones por tarea paralela
+BATCH_ENCODE = 128
+
+# Peso de cada componente (Título, Skills, Experiencia) en cada caso de uso.
+# Equivale a los promedios de buscador_candidato.py, opción por opción.
+PESOS_ESTRATEGIA = {
+    1: (1.0, 0.0, 0.0),
+    2: (0.0, 1.0, 0.0),
+    3: (0.0, 0.0, 1.0),
+    4: (1 / 2, 1 / 2, 0.0),
+    5: (1 / 2, 0.0, 1 / 2),
+    6: (0.0, 1 / 2, 1 / 2),
+    7: (1 / 3, 1 / 3, 1 / 3),
+}
+
+
+def leer_requisiciones(ruta):
+    """
+    Lee requisiciones desde CSV (cabecera: id,titulo,skills,experiencia,estrategia)
+    o JSON (lista de objetos con las mismas claves).
+    """
+    if ruta.lower().endswith(".json"):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            filas = json.load(f)
+    else:
+        with open(ruta, 'r', encoding='utf-8', newline='') as f:
+            filas = list(csv.DictReader(f))
+
+    requisiciones = []
+    for i, fila in enumerate(filas, start=1):
+        try:
+            exp = int(fila.get('experiencia') or 0)
+        except (TypeError, ValueError):
+            exp = 0
+        try:
+            estrategia = int(fila.get('estrategia') or ESTRATEGIA_POR_DEFECTO)
+        except (TypeError, ValueError):
+            estrategia = ESTRATEGIA_POR_DEFECTO
+        if estrategia not in PESOS_ESTRATEGIA:
+            print(f"⚠️ Requisición {i}: estrategia {estrategia} inválida, se usa {ESTRATEGIA_POR_DEFECTO}.")
+            estrategia = ESTRATEGIA_POR_DEFECTO
+
+        requisiciones.append({
+            "id": str(fila.get('id') or f"req_{i}"),
+            "titulo": fila.get('titulo') or "",
+            "skills": fila.get('skills') or "",
+            "experiencia": exp,
+            "estrategia": estrategia,
+        })
+    return requisiciones
+
+
+def codificar_textos(textos, model):
+    """
+    Codifica en batch solo los textos únicos y devuelve una matriz normalizada
+    (coseno = producto punto). Los textos vacíos quedan como vector cero,
+    igual que calcular_similitud() que devuelve 0.0 para ellos.
+    """
+    unicos = sorted({t for t in textos if t})
+    dim = model.get_sentence_embedding_dimension()
+    if not unicos:
+        return np.zeros((len(textos), dim), dtype=np.float32)
+
+    embs = model.encode(unicos, batch_size=BATCH_ENCODE, convert_to_numpy=True,
+                        normalize_embeddings=True, show_progress_bar=False).astype(np.float32)
+    posicion = {t: i for i, t in enumerate(unicos)}
+    salida = np.zeros((len(textos), dim), dtype=np.float32)
+    for i, t in enumerate(textos):
+        if t:
+            salida[i] = embs[posicion[t]]
+    return salida
+
+
+def cargar_candidatos(collection, model):
+    """Codifica una sola vez los títulos y skills de todos los candidatos."""
+    ids, metas = [], []
+    for doc_id, m in iterar_metadatos(collection):
+        ids.append(doc_id)
+        metas.append(m)
+    emb_t = codificar_textos([m.get('titles', '') for m in metas], model)
+    emb_s = codificar_textos([m.get('skills', '') for m in metas], model)
+    exp = np.array([m.get('years_experience', 0) or 0 for m in metas], dtype=np.float32)
+    return ids, metas, emb_t, emb_s, exp
+
+
+def _top_k_bloque(scores, k):
+    """Índices de los k mayores por fila (sin orden), vía argpartition."""
+    if scores.shape[1] <= k:
+        return np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    # Sin negar la matriz: -scores sería otra copia completa del bloque
+    return np.argpartition(scores, -k, axis=1)[:, -k:]
+
+
+def puntuar_bloque(q_t, q_s, q_exp, pesos, emb_t, emb_s, exp, k, max_columnas):
+    """
+    Calcula los scores de un bloque de trabajos contra todos los candidatos,
+    recorriendo los candidatos en bloques de max_columnas y manteniendo solo
+    el top-k parcial por trabajo. Devuelve (indices, scores) de tamaño J x k'.
+    """
+    n_trab = q_t.shape[0]
+    mejores_idx = np.empty((n_trab, 0), dtype=np.int64)
+    mejores_score = np.empty((n_trab, 0), dtype=np.float32)
+
+    for inicio in range(0, emb_t.shape[0], max_columnas):
+        fin = min(inicio + max_columnas, emb_t.shape[0])
+        final = pesos[:, 0:1] * (q_t @ emb_t[inicio:fin].T)
+        final += pesos[:, 1:2] * (q_s @ emb_s[inicio:fin].T)
+        final += pesos[:, 2:3] * (exp[None, inicio:fin] >= q_exp[:, None])
+
+        # Fusionamos el top-k acumulado con el del bloque actual
+        cand_idx = np.concatenate([mejores_idx, inicio + _top_k_bloque(final, k)], axis=1)
+        filas = np.arange(n_trab)[:, None]
+        cand_score = np.concatenate([mejores_score, final[filas, cand_idx[:, mejores_idx.shape[1]:] - inicio]], axis=1)
+        sel = _top_k_bloque(cand_score, k)
+        mejores_idx = cand_idx[filas, sel]
+        mejores_score = cand_score[filas, sel]
+
+    return mejores_idx, mejores_score
+
+
+def detalle_score(estrategia, score_t, score_s, score_e):
+    """Mismo formato de detalle que el buscador interactivo."""
+    if estrategia == 1: return f"T({score_t:.2f})"
+    if estrategia == 2: return f"S({score_s:.2f})"
+    if estrategia == 3: return f"E({score_e})"
+    if estrategia == 4: return f"Avg(T:{score_t:.2f}, S:{score_s:.2f})"
+    if estrategia == 5: return f"Avg(T:{score_t:.2f}, E:{score_e})"
+    if estrategia == 6: return f"Avg(S:{score_s:.2f}, E:{score_e})"
+    return f"Avg(T:{score_t:.2f}, S:{score_s:.2f}, E:{score_e})"
+
+
+def escribir_shortlist(req, filas, nombres_usados):
+    """
+    Escribe la shortlist en DIRECTORIO_SALIDA. Si el id saneado coincide con
+    el de otra requisición (p. ej. 'a/b' y 'a_b'), se le añade un sufijo.
+    """
+    os.makedirs(DIRECTORIO_SALIDA, exist_ok=True)
+    base = "".join(c if c.isalnum() or c in "-_" else "_" for c in req["id"])
+    nombre, n = base, 2
+    # En minúsculas: en Windows/macOS 'A.csv' y 'a.csv' son el mismo archivo
+    while nombre.lower() in nombres_usados:
+        nombre, n = f"{base}_{n}", n + 1
+    if nombre != base:
+        print(f"⚠️ Requisición '{req['id']}': el archivo '{base}.csv' ya está en uso, se escribe '{nombre}.csv'.")
+    nombres_usados.add(nombre.lower())
+    ruta = os.path.join(DIRECTORIO_SALIDA, f"{nombre}.csv")
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Ranking", "ID_Archivo", "Candidato", "Match %", "Detalle Score"])
+        writer.writerows(filas)
+    return ruta
+
+
+def ejecutar_matching_lote(ruta_requisiciones=ARCHIVO_REQUISICIONES):
+    if not os.path.exists(ruta_requisiciones):
+        print(f"❌ No existe el archivo de requisiciones '{ruta_requisiciones}'.")
+        return
+
+    t0 = time.time()
+    requisiciones = leer_requisiciones(ruta_requisiciones)
+    if not requisiciones:
+        print("📭 El archivo de requisiciones está vacío.")
+        return
+
+    collection, model = conectar_db()
+    ids, metas, emb_t, emb_s, exp = cargar_candidatos(collection, model)
+    if not ids:
+        print("📭 Base de datos vacía.")
+        return
+    print(f"--- {len(requisiciones)} REQUISICIONES x {len(ids)} CANDIDATOS ---")
+
+    # Todas las consultas en un único batch por campo
+    q_t = codificar_textos([r["titulo"] for r in requisiciones], model)
+    q_s = codificar_textos([r["skills"] for r in requisiciones], model)
+    q_exp = np.array([r["experiencia"] for r in requisiciones], dtype=np.float32)
+    pesos = np.array([PESOS_ESTRATEGIA[r["estrategia"]] for r in requisiciones], dtype=np.float32)
+
+    # Margen extra para poder colapsar duplicados sin quedarnos cortos
+    k = min(len(ids), TOP_K * 3 if COLAPSAR_DUPLICADOS else TOP_K)
+
+    # Pico por celda de BLOQUE_TRABAJOS x columnas: score final + temporales del producto
+    # (float32) y los índices int64 de argpartition, ~6 x 4 bytes
+    bytes_por_hilo = MEMORIA_MAX_MB * 1024 * 1024 // NUM_HILOS
+    max_columnas = max(k, bytes_por_hilo // (4 * 6 * BLOQUE_TRABAJOS))
+
+    def tarea(inicio):
+        sl = slice(inicio, inicio + BLOQUE_TRABAJOS)
+        return inicio, puntuar_bloque(q_t[sl], q_s[sl], q_exp[sl], pesos[sl], emb_t, emb_s, exp, k, max_columnas)
+
+    # numpy libera el GIL durante las multiplicaciones, así que los hilos escalan por núcleo
+    with ThreadPoolExecutor(max_workers=NUM_HILOS) as pool:
+        resultados = list(pool.map(tarea, range(0, len(requisiciones), BLOQUE_TRABAJOS)))
+
+    nombres_usados = set()
+    for inicio, (idx_bloque, score_bloque) in resultados:
+        for j in range(idx_bloque.shape[0]):
+            req = requisiciones[inicio + j]
+            orden = np.argsort(-score_bloque[j], kind='stable')
+            filas, vistos = [], set()
+            for pos in orden:
+                c = int(idx_bloque[j, pos])
+                m = metas[c]
+                grupo = m.get('canonical_id', ids[c])
+                if COLAPSAR_DUPLICADOS and grupo in vistos:
+                    continue
+                vistos.add(grupo)
+
+                score_t = float(q_t[inicio + j] @ emb_t[c])
+                score_s = float(q_s[inicio + j] @ emb_s[c])
+                score_e = 1.0 if exp[c] >= req["experiencia"] else 0.0
+                filas.append([
+                    len(filas) + 1,
+                    ids[c],
+                    m.get('candidate_name', 'Unknown')[:25],
+                    f"{float(score_bloque[j, pos]) * 100:.1f}",
+                    detalle_score(req["estrategia"], score_t, score_s, score_e),
+                ])
+                if len(filas) == TOP_K:
+                    break
+            ruta = escribir_shortlist(req, filas, nombres_usados)
+            print(f"✅ {req['id']:<20} | Caso {req['estrategia']} | {len(filas)} candidatos -> {ruta}")
+
+    print(f"\n⏱️  Tiempo total: {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    ejecutar_matching_lote(sys.argv[1] if len(sys.argv) > 1 else ARCHIVO_REQUISICIONES)
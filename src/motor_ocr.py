@@ -0,0 +1,112 @@
+import os
+import abc
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import pytesseract
+
+# tesserocr (bindings de la API C de Tesseract) es opcional: sin él se usa pytesseract
+try:
+    import tesserocr
+    TESSEROCR_DISPONIBLE = True
+except ImportError:
+    TESSEROCR_DISPONIBLE = False
+
+# --- CONFIGURACIÓN ---
+IDIOMAS_OCR = 'spa+eng'
+MOTOR_OCR = "auto"           # "auto" | "persistente" | "subproceso"
+NUM_WORKERS_OCR = min(4, os.cpu_count() or 1)
+RUTA_TESSDATA = os.environ.get("TESSDATA_PREFIX")   # Necesario para tesserocr en Windows
+
+# Configuración OCR Windows (aquí para que la reciba todo el que use pytesseract vía este módulo)
+path_tesseract = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+if os.name == 'nt' and os.path.exists(path_tesseract):
+    pytesseract.pytesseract.tesseract_cmd = path_tesseract
+
+
+def pixmap_a_imagen(pix):
+    """Convierte un Pixmap de PyMuPDF en imagen PIL directamente desde el buffer (sin PNG)."""
+    modo = {1: "L", 3: "RGB", 4: "RGBA"}[pix.n]
+    return Image.frombytes(modo, (pix.width, pix.height), pix.samples, "raw", modo, pix.stride)
+
+
+class MotorOCR(abc.ABC):
+    """Interfaz común de los motores OCR: reciben Pixmaps de PyMuPDF y devuelven texto."""
+
+    def __init__(self, num_workers=NUM_WORKERS_OCR):
+        self.num_workers = num_workers
+        self._hilos = ThreadPoolExecutor(max_workers=num_workers)
+
+    @abc.abstractmethod
+    def reconocer(self, pix):
+        """Texto de una página (cadena vacía si el OCR falla)."""
+
+    def reconocer_lote(self, pixmaps):
+        """OCR de varias páginas en paralelo, manteniendo el orden."""
+        if len(pixmaps) <= 1:
+            return [self.reconocer(pix) for pix in pixmaps]
+        return list(self._hilos.map(self.reconocer, pixmaps))
+
+    def cerrar(self):
+        self._hilos.shutdown(wait=True)
+
+
+class MotorOCRSubproceso(MotorOCR):
+    """Ruta clásica: pytesseract lanza un proceso tesseract y recarga los idiomas en cada página."""
+
+    def reconocer(self, pix):
+        try:
+            return pytesseract.image_to_string(pixmap_a_imagen(pix), lang=IDIOMAS_OCR)
+        except Exception:
+            return ""
+
+
+class MotorOCRPersistente(MotorOCR):
+    """
+    Pool de instancias de la API C de Tesseract (tesserocr) creadas una sola vez:
+    el traineddata queda cargado y cada página se pasa como buffer crudo de píxeles.
+    """
+
+    def __init__(self, num_workers=NUM_WORKERS_OCR):
+        super().__init__(num_workers)
+        self._apis = queue.Queue()
+        try:
+            for _ in range(num_workers):
+                if RUTA_TESSDATA:
+                    api = tesserocr.PyTessBaseAPI(path=RUTA_TESSDATA, lang=IDIOMAS_OCR)
+                else:
+                    api = tesserocr.PyTessBaseAPI(lang=IDIOMAS_OCR)
+                self._apis.put(api)
+        except RuntimeError:
+            # Sin traineddata de algún idioma (o de otra versión): liberamos lo ya creado
+            self.cerrar()
+            raise
+
+    def reconocer(self, pix):
+        api = self._apis.get()
+        try:
+            api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+            return api.GetUTF8Text()
+        except Exception:
+            return ""
+        finally:
+            api.Clear()
+            self._apis.put(api)
+
+    def cerrar(self):
+        super().cerrar()
+        while not self._apis.empty():
+            self._apis.get_nowait().End()
+
+
+def crear_motor_ocr(tipo=MOTOR_OCR, num_workers=NUM_WORKERS_OCR):
+    if tipo == "persistente" or (tipo == "auto" and TESSEROCR_DISPONIBLE):
+        if not TESSEROCR_DISPONIBLE:
+            print("⚠️ tesserocr no está instalado. Se usa pytesseract (un proceso por página).")
+            return MotorOCRSubproceso(num_workers)
+        try:
+            return MotorOCRPersistente(num_workers)
+        except RuntimeError as e:
+            print(f"⚠️ tesserocr no pudo cargar '{IDIOMAS_OCR}' ({e}). Se usa pytesseract (un proceso por página).")
+            return MotorOCRSubproceso(num_workers)
+    return MotorOCRSubproceso(num_workers)